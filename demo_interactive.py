@@ -4,127 +4,30 @@ Interactive RAG Demo with Streaming - Ask your own questions!
 """
 from rag_service import TicketRAGService
 from llm_service import MockLLMService, LocalLLMService
-from datetime import datetime, timedelta
+from sample_data import get_sample_tickets
+import re
 import sys
 
 
-def create_sample_tickets():
-    """Create sample ticket data for testing"""
-    sample_tickets = [
-        {
-            'id': 1,
-            'title': 'Login page not loading',
-            'ticket_description': 'Users are reporting that the login page shows a blank screen when accessed from Chrome browser. This started happening after the latest deployment.',
-            'status': 'open',
-            'priority': 'high',
-            'created_date': datetime.now() - timedelta(days=2),
-            'closed_date': None,
-            'created_by': 'john.doe',
-            'assigned_to': 'jane.smith',
-            'cc_admins': ['admin1', 'admin2'],
-            'cc_non_admins': ['user1']
-        },
-        {
-            'id': 2,
-            'title': 'Password reset emails not sending',
-            'ticket_description': 'Multiple users have reported not receiving password reset emails. SMTP server logs show connection timeout errors.',
-            'status': 'in_progress',
-            'priority': 'urgent',
-            'created_date': datetime.now() - timedelta(days=1),
-            'closed_date': None,
-            'created_by': 'sarah.johnson',
-            'assigned_to': 'bob.wilson',
-            'cc_admins': ['admin1'],
-            'cc_non_admins': []
-        },
-        {
-            'id': 3,
-            'title': 'Dashboard loading slowly',
-            'ticket_description': 'The main dashboard takes 30+ seconds to load. Database queries appear to be unoptimized. Affecting all users.',
-            'status': 'open',
-            'priority': 'medium',
-            'created_date': datetime.now() - timedelta(days=5),
-            'closed_date': None,
-            'created_by': 'mike.brown',
-            'assigned_to': 'alice.chen',
-            'cc_admins': [],
-            'cc_non_admins': ['user2', 'user3']
-        },
-        {
-            'id': 4,
-            'title': 'Export to CSV feature broken',
-            'ticket_description': 'When users try to export reports to CSV, they receive a 500 error. Error logs show encoding issues with special characters.',
-            'status': 'closed',
-            'priority': 'low',
-            'created_date': datetime.now() - timedelta(days=10),
-            'closed_date': datetime.now() - timedelta(days=3),
-            'created_by': 'lisa.anderson',
-            'assigned_to': 'jane.smith',
-            'cc_admins': ['admin2'],
-            'cc_non_admins': []
-        },
-        {
-            'id': 5,
-            'title': 'Mobile app crashes on iOS 17',
-            'ticket_description': 'Users on iOS 17 report that the mobile app crashes immediately after opening. Works fine on iOS 16 and Android.',
-            'status': 'open',
-            'priority': 'high',
-            'created_date': datetime.now() - timedelta(hours=6),
-            'closed_date': None,
-            'created_by': 'tom.davis',
-            'assigned_to': 'bob.wilson',
-            'cc_admins': ['admin1', 'admin2'],
-            'cc_non_admins': ['user1', 'user2']
-        },
-        {
-            'id': 6,
-            'title': 'API rate limiting too aggressive',
-            'ticket_description': 'Partners are complaining that API rate limits are too strict. They are getting 429 errors even with normal usage patterns.',
-            'status': 'in_progress',
-            'priority': 'medium',
-            'created_date': datetime.now() - timedelta(days=4),
-            'closed_date': None,
-            'created_by': 'emily.white',
-            'assigned_to': 'alice.chen',
-            'cc_admins': [],
-            'cc_non_admins': ['user3']
-        },
-        {
-            'id': 7,
-            'title': 'Unable to upload large files',
-            'ticket_description': 'Users cannot upload files larger than 50MB. System shows "Request Entity Too Large" error. Need to increase upload limit.',
-            'status': 'closed',
-            'priority': 'medium',
-            'created_date': datetime.now() - timedelta(days=15),
-            'closed_date': datetime.now() - timedelta(days=8),
-            'created_by': 'chris.lee',
-            'assigned_to': 'jane.smith',
-            'cc_admins': ['admin2'],
-            'cc_non_admins': []
-        },
-        {
-            'id': 8,
-            'title': 'Search functionality returns no results',
-            'ticket_description': 'Global search feature is broken. Users enter queries but get zero results even for known existing content.',
-            'status': 'open',
-            'priority': 'urgent',
-            'created_date': datetime.now() - timedelta(hours=12),
-            'closed_date': None,
-            'created_by': 'david.martinez',
-            'assigned_to': 'Unassigned',
-            'cc_admins': ['admin1'],
-            'cc_non_admins': ['user1', 'user2']
-        },
-    ]
-
-    return sample_tickets
+# Console separators
+SEP = "=" * 70
+THIN = "─" * 70
+DASH = "-" * 70
+
+# Query keywords mapped to metadata filters, checked in order
+STATUS_MAP = {'open': 'open', 'closed': 'closed', 'in_progress': 'in_progress'}
+PRIORITY_MAP = {'urgent': 'urgent', 'high': 'high', 'medium': 'medium', 'low': 'low'}
+
+_TOKEN_RE = re.compile(r"[a-z_]+")
+
+EXIT_COMMANDS = {'exit', 'quit'}
 
 
 def display_results(query, results, llm_service):
     """Display search results with streaming AI response"""
-    print(f"\n{'─' * 70}")
+    print(f"\n{THIN}")
     print(f"Query: {query}")
-    print(f"{'─' * 70}")
+    print(THIN)
 
     if not results:
         print("No results found.")
@@ -142,10 +45,10 @@ def display_results(query, results, llm_service):
 
     # Generate LLM answer with streaming
     print(f"AI Response:")
-    print("-" * 70)
+    print(DASH)
 
-    # Check if we're using MockLLMService (doesn't support streaming)
-    if isinstance(llm_service, MockLLMService):
+    # Services without streaming support (e.g. MockLLMService) return a string
+    if not llm_service.STREAMING:
         answer = llm_service.generate_answer(query, results)
         print(answer)
     else:
@@ -161,15 +64,19 @@ def display_results(query, results, llm_service):
                 for chunk in response_generator:
                     print(chunk, end='', flush=True)
                 print()  # Newline after streaming complete
+            except KeyboardInterrupt:
+                # Stop reading from Ollama right away instead of draining the stream
+                response_generator.close()
+                print("\n[Response cancelled]")
             except Exception as e:
                 print(f"\nStreaming error: {e}")
 
 
 def show_help():
     """Show available commands and example queries"""
-    print("\n" + "=" * 70)
+    print("\n" + SEP)
     print("HELP - Available Commands & Example Queries")
-    print("=" * 70)
+    print(SEP)
     print("\nCommands:")
     print("  help  - Show this help message")
     print("  list  - List all tickets in the database")
@@ -187,17 +94,16 @@ def show_help():
     print("  - What's broken in the system?")
     print("  - Show closed tickets")
     print("  - API related issues")
-    print("=" * 70 + "\n")
+    print(SEP + "\n")
 
 
 def list_all_tickets(rag_service):
     """Display all tickets in the database"""
-    print("\n" + "=" * 70)
+    print("\n" + SEP)
     print("ALL TICKETS IN DATABASE")
-    print("=" * 70 + "\n")
+    print(SEP + "\n")
 
-    # Get all tickets by searching with empty query
-    results = rag_service.search_tickets("", n_results=20)
+    results = rag_service.list_all(limit=20)
 
     if not results:
         print("No tickets found in database.")
@@ -221,12 +127,19 @@ def show_stats(rag_service):
 
 def interactive_search(rag_service, llm_service):
     """Interactive search loop"""
-    print("\n" + "=" * 70)
+    print("\n" + SEP)
     print("INTERACTIVE RAG SEARCH (WITH STREAMING)")
-    print("=" * 70)
+    print(SEP)
     print("\nType your question and press Enter to search.")
     print("Type 'help' for commands and examples, 'exit' to quit.\n")
 
+    # Commands are dispatched before any query parsing or search
+    commands = {
+        'help': show_help,
+        'list': lambda: list_all_tickets(rag_service),
+        'stats': lambda: show_stats(rag_service),
+    }
+
     while True:
         try:
             # Get user input
@@ -237,49 +150,23 @@ def interactive_search(rag_service, llm_service):
                 continue
 
             # Handle commands
-            if query.lower() in ['exit', 'quit']:
+            command = query.lower()
+            if command in EXIT_COMMANDS:
                 print("\nThanks for trying the RAG demo! Goodbye!\n")
                 break
 
-            elif query.lower() == 'help':
-                show_help()
+            handler = commands.get(command)
+            if handler:
+                handler()
                 continue
 
-            elif query.lower() == 'list':
-                list_all_tickets(rag_service)
-                continue
-
-            elif query.lower() == 'stats':
-                show_stats(rag_service)
-                continue
+            # Parse query for filters (whole words only, so "highlight" is not "high")
+            query_lower = query.lower().replace('in progress', 'in_progress')
+            tokens = set(_TOKEN_RE.findall(query_lower))
 
-            # Parse query for filters
-            filter_status = None
-            filter_priority = None
-            check_unassigned = False
-
-            # Detect status filters
-            query_lower = query.lower()
-            if 'open' in query_lower and 'status' in query_lower:
-                filter_status = 'open'
-            elif 'closed' in query_lower:
-                filter_status = 'closed'
-            elif 'in progress' in query_lower or 'in_progress' in query_lower:
-                filter_status = 'in_progress'
-
-            # Detect priority filters
-            if 'urgent' in query_lower:
-                filter_priority = 'urgent'
-            elif 'high priority' in query_lower or 'high' in query_lower:
-                filter_priority = 'high'
-            elif 'medium priority' in query_lower or 'medium' in query_lower:
-                filter_priority = 'medium'
-            elif 'low priority' in query_lower or 'low' in query_lower:
-                filter_priority = 'low'
-
-            # Detect unassigned filter
-            if 'unassigned' in query_lower:
-                check_unassigned = True
+            filter_status = next((v for k, v in STATUS_MAP.items() if k in tokens), None)
+            filter_priority = next((v for k, v in PRIORITY_MAP.items() if k in tokens), None)
+            check_unassigned = 'unassigned' in tokens
 
             # Perform search
             results = rag_service.search_tickets(
@@ -324,18 +211,21 @@ def interactive_search(rag_service, llm_service):
 
 def main():
     """Main interactive demo function"""
-    print("=" * 70)
+    print(SEP)
     print("INTERACTIVE RAG TICKET SEARCH DEMO (WITH STREAMING)")
-    print("=" * 70)
+    print(SEP)
     print("\nInitializing...")
 
     # Initialize services
     print("Loading RAG service...")
-    rag_service = TicketRAGService()
+    rag_service = TicketRAGService(auto_migrate=True)  # Single process, safe to migrate
 
     # Try to use Ollama, fall back to Mock if not available
     print("Checking for Ollama...")
-    llm_service = LocalLLMService(model="llama3.2:3b")
+    llm_service = LocalLLMService(
+        model="llama3.2:3b",
+        embedding_fn=rag_service.embed_query  # Reuses the embedding search_tickets cached
+    )
 
     if llm_service.check_ollama_running():
         print("Ollama is running! Using llama3.2:3b with streaming enabled.")
@@ -349,7 +239,7 @@ def main():
 
     if stats['total_tickets'] == 0:
         print("\nNo tickets found. Loading sample data...")
-        sample_tickets = create_sample_tickets()
+        sample_tickets = get_sample_tickets()
         success_count = rag_service.add_tickets_bulk(sample_tickets)
         print(f"Added {success_count} sample tickets")
     else:
@@ -358,14 +248,14 @@ def main():
     # Start interactive search
     interactive_search(rag_service, llm_service)
 
-    print("=" * 70)
+    print(SEP)
     print("Demo completed!")
     print("\nTips:")
     print("  - Try different phrasings of the same question")
     print("  - Search by status, priority, assignee, or topic")
     print("  - The system understands semantic meaning, not just keywords")
     print("  - AI responses stream in real-time for faster perceived speed")
-    print("=" * 70 + "\n")
+    print(SEP + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Distill the embedding model into a smaller student for faster search
+
+Builds a student that keeps only some of the teacher's transformer layers,
+then trains it with MSELoss to reproduce the teacher's embeddings. The
+student only approximates the teacher's 384-d embedding space as well as its
+training corpus covers your queries, so train on a large sentence/query
+corpus (--train-file) and check the held-out teacher-vs-student cosine
+reported at the end before reusing existing stored embeddings.
+
+Requires the training extras (datasets, accelerate):
+    pip install "sentence-transformers[train]"
+
+Usage:
+    python distill_model.py --layers 0 2 4 --train-file queries.txt --output ./models/miniLM-distilled
+
+Then load it with:
+    TicketRAGService(model_name="./models/miniLM-distilled")
+"""
+import argparse
+import os
+import random
+from copy import deepcopy
+
+import chromadb
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+from sentence_transformers import InputExample, SentenceTransformer, losses
+
+from rag_service import TicketRAGService
+from sample_data import get_sample_tickets
+
+
+def build_student(teacher, layers):
+    """Copy the teacher and keep only the given transformer layers"""
+    student = deepcopy(teacher)
+    auto_model = student[0].auto_model
+    auto_model.encoder.layer = torch.nn.ModuleList(
+        layer for i, layer in enumerate(auto_model.encoder.layer) if i in layers
+    )
+    auto_model.config.num_hidden_layers = len(layers)
+    return student
+
+
+# Below this many sentences the student is unlikely to generalize to new queries
+MIN_RECOMMENDED_TEXTS = 10000
+
+
+def load_indexed_documents(collection_name, path="./chroma_db"):
+    """Read indexed ticket documents, without creating the store or collection"""
+    if not os.path.isdir(path):
+        return []
+    client = chromadb.PersistentClient(path=path)
+    try:
+        collection = client.get_collection(name=collection_name)
+    except Exception:
+        return []
+    return collection.get(include=["documents"])['documents']
+
+
+def collect_training_texts(collection_name, train_file=None):
+    """Use a sentence corpus (one per line) plus indexed and sample tickets"""
+    texts = []
+    if train_file:
+        with open(train_file, encoding="utf-8") as f:
+            texts += [line.strip() for line in f if line.strip()]
+    texts += load_indexed_documents(collection_name)
+    texts += [TicketRAGService.format_ticket_for_embedding(t) for t in get_sample_tickets()]
+    # Short title-only inputs stand in for search queries
+    texts += [t['title'] for t in get_sample_tickets()]
+    return list(dict.fromkeys(texts))
+
+
+def split_held_out(texts, fraction, seed=42):
+    """Shuffle texts and split off a held-out evaluation set"""
+    texts = list(texts)
+    random.Random(seed).shuffle(texts)
+    n_held_out = max(1, int(len(texts) * fraction)) if len(texts) > 1 else 0
+    return texts[n_held_out:], texts[:n_held_out]
+
+
+def embedding_agreement(teacher, student, texts):
+    """Return (mean, min) cosine similarity between teacher and student embeddings"""
+    kwargs = dict(batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    similarities = np.sum(teacher.encode(texts, **kwargs) * student.encode(texts, **kwargs), axis=1)
+    return float(similarities.mean()), float(similarities.min())
+
+
+def main():
+    """Main distillation function"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teacher", default="all-MiniLM-L6-v2",
+                        help="Teacher model name or path (default: all-MiniLM-L6-v2)")
+    parser.add_argument("--collection", default="tickets",
+                        help="Indexed collection to add training texts from, if it exists")
+    parser.add_argument("--layers", type=int, nargs="+", default=[0, 2, 4],
+                        help="Teacher layers to keep in the student (default: 0 2 4)")
+    parser.add_argument("--output", default="./models/miniLM-distilled",
+                        help="Directory to save the student model")
+    parser.add_argument("--train-file",
+                        help="Text file with one training sentence or query per line")
+    parser.add_argument("--eval-fraction", type=float, default=0.1,
+                        help="Fraction of texts held out to compare teacher and student (default: 0.1)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    print("Loading teacher model...")
+    # Full precision for training; the student can still run in FP16/BF16 later
+    teacher = SentenceTransformer(args.teacher)
+
+    texts, held_out = split_held_out(collect_training_texts(args.collection, args.train_file), args.eval_fraction)
+    if len(texts) < MIN_RECOMMENDED_TEXTS:
+        print(f"Warning: only {len(texts)} training texts; pass --train-file with a large "
+              f"sentence/query corpus (>= {MIN_RECOMMENDED_TEXTS}) or the student won't match the teacher")
+    print(f"Encoding {len(texts)} training texts with the teacher...")
+    teacher_embeddings = teacher.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+
+    print(f"Building student with layers {args.layers}...")
+    student = build_student(teacher, args.layers)
+
+    examples = [InputExample(texts=[text], label=emb) for text, emb in zip(texts, teacher_embeddings)]
+    loader = DataLoader(examples, shuffle=True, batch_size=args.batch_size)
+    loss = losses.MSELoss(model=student)
+
+    student.fit(
+        train_objectives=[(loader, loss)],
+        epochs=args.epochs,
+        warmup_steps=max(1, len(loader) * args.epochs // 10),
+        show_progress_bar=True
+    )
+
+    student.save(args.output)
+    print(f"\nSaved distilled model to {args.output}")
+
+    if held_out:
+        mean_cos, min_cos = embedding_agreement(teacher, student, held_out)
+        print(f"Teacher vs student cosine on {len(held_out)} held-out texts: mean {mean_cos:.3f}, min {min_cos:.3f}")
+    print(f'Use it with: TicketRAGService(model_name="{args.output}")')
+    print("Keep existing embeddings only if the held-out cosine is close to 1.0; "
+          "otherwise run `python manage.py rebuild_rag_index` after switching")
+
+
+if __name__ == "__main__":
+    main()
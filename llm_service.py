@@ -3,32 +3,247 @@ LLM Service for generating responses from retrieved tickets
 Uses Ollama for local LLM inference
 """
 import requests
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
+import hashlib
+import io
 import json
+import re
+import time
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encoding/decoding
+    orjson = None
+
+
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+
+# Pulls the token out of an Ollama stream line without a full JSON parse
+_RESPONSE_RE = re.compile(rb'"response":"((?:[^"\\]|\\.)*)"')
+
+# Fixed parts of the LLM prompt around the ticket context and question
+_PROMPT_PREFIX = (
+    "You are a helpful assistant that answers questions about support tickets.\n"
+    "\n"
+    "Context (Retrieved Tickets):\n"
+)
+_PROMPT_SUFFIX = """
+
+Instructions:
+- Answer based ONLY on the information in the retrieved tickets above
+- Be concise and specific
+- If the tickets don't contain relevant information, say so
+- Include ticket numbers when referencing specific tickets
+- If multiple tickets are relevant, summarize the key points
+
+Answer:"""
+
+# Seconds a successful Ollama health check is trusted before probing again
+OLLAMA_ALIVE_TTL = 10.0
+
+
+class SemanticCache:
+    """
+    In-memory cache of generated answers keyed by query embedding and context
+
+    A lookup returns a stored answer when the cosine similarity between the
+    new query and a cached query reaches the threshold and both answers were
+    generated from the same retrieved context. Entries expire after ttl
+    seconds and the least recently used entry is evicted when full.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_size: int = 256,
+        ttl: float = 300.0,
+        duplicate_threshold: float = 0.95
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_size: Maximum number of cached answers
+            ttl: Seconds before a cached answer expires
+            duplicate_threshold: Similarity above which a new answer replaces
+                the existing entry instead of adding a new one
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.duplicate_threshold = duplicate_threshold
+        # Entry key -> (normalized embedding, answer, timestamp, context key), in LRU order
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _purge_expired(self):
+        cutoff = time.monotonic() - self.ttl
+        for key in [k for k, (_, _, ts, _) in self._entries.items() if ts < cutoff]:
+            del self._entries[key]
+
+    def _best_match(self, vector: np.ndarray, context_key: Optional[str]):
+        """Return (key, similarity) of the closest cached query, or (None, -1.0)"""
+        keys = [k for k, entry in self._entries.items() if entry[3] == context_key]
+        if not keys:
+            return None, -1.0
+
+        matrix = np.stack([self._entries[k][0] for k in keys])
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        return keys[best], float(similarities[best])
+
+    def lookup(self, embedding, context_key: Optional[str] = None) -> Optional[str]:
+        """
+        Find a cached answer for a query embedding
+
+        Args:
+            embedding: Query embedding
+            context_key: Fingerprint of the context the answer must be based on
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+        self._purge_expired()
+        key, similarity = self._best_match(self._normalize(embedding), context_key)
+        if key is None or similarity < self.threshold:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key][1]
+
+    def store(self, embedding, answer: str, context_key: Optional[str] = None):
+        """
+        Cache an answer for a query embedding
+
+        Args:
+            embedding: Query embedding
+            answer: Generated answer to cache
+            context_key: Fingerprint of the context the answer was generated from
+        """
+        self._purge_expired()
+        vector = self._normalize(embedding)
+        key, similarity = self._best_match(vector, context_key)
+
+        # Near-duplicate query over the same context: refresh the entry in place
+        if key is not None and similarity > self.duplicate_threshold:
+            self._entries[key] = (vector, answer, time.monotonic(), context_key)
+            self._entries.move_to_end(key)
+            return
+
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+
+        self._entries[self._next_key] = (vector, answer, time.monotonic(), context_key)
+        self._next_key += 1
+
+
+class StreamHandle:
+    """
+    Iterable over streamed LLM text chunks that can be cancelled
+
+    close() stops the stream and releases the underlying HTTP response, so
+    an interrupted answer does not keep draining tokens from the socket.
+    """
+
+    def __init__(self, chunks, response=None):
+        """
+        Args:
+            chunks: Iterator of text chunks
+            response: Streaming HTTP response the chunks are read from
+        """
+        self._chunks = chunks
+        self._response = response
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        """Stop streaming and close the HTTP response"""
+        close_chunks = getattr(self._chunks, 'close', None)
+        if close_chunks is not None:
+            close_chunks()
+        if self._response is not None:
+            self._response.close()
 
 
 class LocalLLMService:
     """
     Service for generating responses using locally running Ollama
     """
-    
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2"):
+
+    # Whether generate_answer(stream=True) yields chunks incrementally
+    STREAMING = True
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama2",
+        embedding_fn: Optional[Callable[[str], Any]] = None,
+        cache: Optional[SemanticCache] = None
+    ):
         """
         Initialize LLM service
         
         Args:
             base_url: Ollama API endpoint
             model: Model name to use (llama2, mistral, codellama, etc.)
+            embedding_fn: Function mapping a query to its embedding, e.g.
+                TicketRAGService.embed_query (reuses the search embedding).
+                Enables the semantic answer cache when provided.
+            cache: Semantic cache to use (defaults to a new SemanticCache)
         """
         self.base_url = base_url
         self.model = model
         self.api_url = f"{base_url}/api/generate"
+        self.embedding_fn = embedding_fn
+        self.cache = (cache or SemanticCache()) if embedding_fn is not None else None
+
+        # Reuse keep-alive connections to Ollama across calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Skip the liveness probe until this monotonic time after a success
+        self._ollama_alive_until = 0.0
     
     def check_ollama_running(self) -> bool:
         """Check if Ollama is running and accessible"""
+        if time.monotonic() < self._ollama_alive_until:
+            return True
+
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=2)
-            return response.status_code == 200
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=2)
+            if response.status_code == 200:
+                self._ollama_alive_until = time.monotonic() + OLLAMA_ALIVE_TTL
+                return True
+            return False
         except:
             return False
     
@@ -47,8 +262,17 @@ class LocalLLMService:
             stream: Whether to stream the response
 
         Returns:
-            Generated answer string (if stream=False) or generator (if stream=True)
+            Generated answer string (if stream=False) or StreamHandle (if stream=True)
         """
+        # Serve semantically equivalent queries over the same tickets from the cache
+        query_embedding = None
+        if self.cache is not None:
+            query_embedding = self.embedding_fn(query)
+            context_key = self._context_key(context_tickets)
+            cached = self.cache.lookup(query_embedding, context_key)
+            if cached is not None:
+                return StreamHandle(iter([cached])) if stream else cached
+
         if not self.check_ollama_running():
             return (
                 "Ollama is not running. Please start Ollama first:\n"
@@ -58,16 +282,13 @@ class LocalLLMService:
                 self._format_fallback_response(context_tickets)
             )
 
-        # Build context from retrieved tickets
-        context = self._build_context(context_tickets)
-
-        # Create prompt
-        prompt = self._create_prompt(query, context)
+        # Create prompt with context from retrieved tickets
+        prompt = self._create_prompt(query, context_tickets)
 
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                json={
+                data=_json_dumps({
                     "model": self.model,
                     "prompt": prompt,
                     "stream": stream,
@@ -75,94 +296,149 @@ class LocalLLMService:
                         "temperature": 0.7,
                         "num_predict": 500
                     }
-                },
+                }),
+                headers={"Content-Type": "application/json"},
                 timeout=60,
                 stream=stream
             )
 
             if response.status_code == 200:
                 if stream:
-                    # Return generator for streaming
-                    return self._stream_response(response)
+                    # Return a cancellable handle for streaming
+                    chunks = self._stream_response(response)
+                    if query_embedding is not None:
+                        chunks = self._cache_stream(chunks, query_embedding, context_key)
+                    return StreamHandle(chunks, response)
                 else:
-                    result = response.json()
+                    result = _json_loads(response.content)
+                    if query_embedding is not None and 'response' in result:
+                        self.cache.store(query_embedding, result['response'], context_key)
                     return result.get('response', 'No response generated')
             else:
                 return f"Error: {response.status_code} - {response.text}"
 
         except Exception as e:
+            # Force a fresh health check on the next call
+            self._ollama_alive_until = 0.0
             return f"Error generating response: {str(e)}\n\nFalling back to search results:\n\n{self._format_fallback_response(context_tickets)}"
 
     def _stream_response(self, response):
         """
         Generator that yields response chunks as they arrive from Ollama
 
+        Reads raw chunks as soon as the socket delivers them and splits them
+        into lines here, rather than waiting on iter_lines() to fill its
+        read buffer.
+
         Args:
             response: Streaming HTTP response from Ollama
 
         Yields:
             Text chunks from the LLM
         """
-        import json
+        pending = b""
+        for data in response.iter_content(chunk_size=None):
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                token = self._parse_stream_line(line)
+                if token is not None:
+                    yield token
+
+        token = self._parse_stream_line(pending)
+        if token is not None:
+            yield token
+
+    def _parse_stream_line(self, line: bytes) -> Optional[str]:
+        """Extract the response token from one Ollama stream line"""
+        line = line.strip()
+        if not line:
+            return None
+
+        # Fast path: plain tokens need no unescaping
+        match = _RESPONSE_RE.search(line)
+        if match and b'\\' not in match.group(1):
+            return match.group(1).decode('utf-8')
 
-        for line in response.iter_lines():
-            if line:
-                try:
-                    chunk = json.loads(line)
-                    if 'response' in chunk:
-                        yield chunk['response']
-                except json.JSONDecodeError:
-                    continue
+        try:
+            chunk = _json_loads(line)
+        except json.JSONDecodeError:
+            return None
+        return chunk.get('response') if isinstance(chunk, dict) else None
+
+    @staticmethod
+    def _context_key(tickets: List[Dict[str, Any]]) -> str:
+        """
+        Fingerprint the retrieved tickets an answer is generated from
+
+        Uses ticket ids plus the document hash stored by the RAG service, so
+        the key changes when different tickets are retrieved or one is edited.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for ticket in tickets:
+            metadata = ticket.get('metadata') or {}
+            version = metadata.get('document_hash') or metadata.get('content_hash') or ticket.get('content', '')
+            digest.update(f"{ticket.get('ticket_id', '')}\0{version}\0".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _cache_stream(self, chunks, query_embedding, context_key: str):
+        """
+        Pass streamed chunks through and cache the full answer once complete
 
-    def _build_context(self, tickets: List[Dict[str, Any]]) -> str:
-        """Build context string from retrieved tickets"""
+        Args:
+            chunks: Generator of text chunks from the LLM
+            query_embedding: Embedding of the query being answered
+            context_key: Fingerprint of the retrieved tickets
+
+        Yields:
+            Text chunks from the LLM
+        """
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        if parts:
+            self.cache.store(query_embedding, "".join(parts), context_key)
+
+    def _build_context(self, tickets: List[Dict[str, Any]], write: Callable[[str], Any]):
+        """Write the context section for retrieved tickets using write()"""
         if not tickets:
-            return "No relevant tickets found."
+            write("No relevant tickets found.")
+            return
 
-        context_parts = []
         for i, ticket in enumerate(tickets, 1):
-            metadata = ticket.get('metadata', {})
             content = ticket.get('content', '')
             relevance = ticket.get('relevance_score', 0)
 
-            context_parts.append(
+            if i > 1:
+                write("\n")
+            write(
                 f"--- Ticket {i} (Relevance: {relevance:.2%}) ---\n"
                 f"{content}\n"
             )
 
-        return "\n".join(context_parts)
-
-    def _create_prompt(self, query: str, context: str) -> str:
-        """Create the prompt for the LLM"""
-        prompt = f"""You are a helpful assistant that answers questions about support tickets.
-
-Context (Retrieved Tickets):
-{context}
-
-User Question: {query}
-
-Instructions:
-- Answer based ONLY on the information in the retrieved tickets above
-- Be concise and specific
-- If the tickets don't contain relevant information, say so
-- Include ticket numbers when referencing specific tickets
-- If multiple tickets are relevant, summarize the key points
-
-Answer:"""
-
-        return prompt
+    def _create_prompt(self, query: str, tickets: List[Dict[str, Any]]) -> str:
+        """Create the prompt for the LLM in a single buffer"""
+        buf = io.StringIO()
+        buf.write(_PROMPT_PREFIX)
+        self._build_context(tickets, buf.write)
+        buf.write("\n\nUser Question: ")
+        buf.write(query)
+        buf.write(_PROMPT_SUFFIX)
+        return buf.getvalue()
 
     def _format_fallback_response(self, tickets: List[Dict[str, Any]]) -> str:
         """Format tickets as fallback when LLM is unavailable"""
         if not tickets:
             return "No relevant tickets found."
 
-        response = "Found relevant tickets:\n\n"
+        parts = ["Found relevant tickets:\n\n"]
         for i, ticket in enumerate(tickets, 1):
             metadata = ticket.get('metadata', {})
             relevance = ticket.get('relevance_score', 0)
 
-            response += (
+            parts.append(
                 f"{i}. Ticket #{metadata.get('ticket_id', 'N/A')} "
                 f"(Relevance: {relevance:.2%})\n"
                 f"   Title: {metadata.get('title', 'N/A')}\n"
@@ -171,7 +447,7 @@ Answer:"""
                 f"   Assigned to: {metadata.get('assigned_to', 'N/A')}\n\n"
             )
 
-        return response
+        return "".join(parts)
 
 
 class MockLLMService(LocalLLMService):
@@ -180,6 +456,8 @@ class MockLLMService(LocalLLMService):
     Returns formatted search results instead of generated text
     """
 
+    STREAMING = False
+
     def __init__(self):
         super().__init__()
 
@@ -194,13 +472,13 @@ class MockLLMService(LocalLLMService):
             return f"I couldn't find any tickets relevant to: '{query}'"
 
         # Create a simple summary
-        response = f"Based on your query '{query}', I found {len(context_tickets)} relevant ticket(s):\n\n"
+        parts = [f"Based on your query '{query}', I found {len(context_tickets)} relevant ticket(s):\n\n"]
 
         for i, ticket in enumerate(context_tickets, 1):
             metadata = ticket.get('metadata', {})
             relevance = ticket.get('relevance_score', 0)
 
-            response += (
+            parts.append(
                 f"{i}. **Ticket #{metadata.get('ticket_id', 'N/A')}** - {metadata.get('title', 'N/A')}\n"
                 f"   - Status: {metadata.get('status', 'N/A')}\n"
                 f"   - Priority: {metadata.get('priority', 'N/A')}\n"
@@ -208,4 +486,4 @@ class MockLLMService(LocalLLMService):
                 f"   - Relevance: {relevance:.1%}\n\n"
             )
 
-        return response
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
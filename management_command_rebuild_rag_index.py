@@ -0,0 +1,61 @@
+"""
+Django management command to rebuild the RAG index in bulk
+Add this to your tickets/management/commands/rebuild_rag_index.py
+
+Also migrates a collection created with outdated HNSW index settings;
+run it once after upgrading, before starting the web workers.
+
+Usage:
+    python manage.py rebuild_rag_index
+    python manage.py rebuild_rag_index --chunk-size 256
+"""
+from django.core.management.base import BaseCommand
+from django.db.models.signals import post_save
+from tickets.models import Ticket
+from tickets.signals import (
+    get_rag_service,
+    rag_ticket_queryset,
+    sync_ticket_to_rag,
+    ticket_to_payload,
+)
+
+
+class Command(BaseCommand):
+    help = "Re-index all tickets in the RAG system using batched embedding"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=512,
+            help='Number of tickets loaded, embedded and upserted per batch (default: 512)'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        rag_service = get_rag_service()
+        total = Ticket.objects.count()
+        indexed = 0
+
+        # One-shot migration of outdated HNSW settings (workers never migrate implicitly)
+        if rag_service.needs_index_migration():
+            rag_service.migrate_index()
+
+        self.stdout.write(f"Re-indexing {total} tickets in chunks of {chunk_size}...")
+
+        # Tickets are indexed here in bulk, so keep the per-ticket signal out of the way
+        post_save.disconnect(sync_ticket_to_rag, sender=Ticket)
+        try:
+            buffer = []
+            for ticket in rag_ticket_queryset().iterator(chunk_size=chunk_size):
+                buffer.append(ticket_to_payload(ticket))
+                if len(buffer) >= chunk_size:
+                    indexed += rag_service.add_tickets_bulk(buffer)
+                    buffer = []
+
+            if buffer:
+                indexed += rag_service.add_tickets_bulk(buffer)
+        finally:
+            post_save.connect(sync_ticket_to_rag, sender=Ticket)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed}/{total} tickets"))
@@ -3,10 +3,170 @@ RAG Service for Ticket System
 Handles embedding, indexing, and retrieval of tickets
 """
 import chromadb
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+import hashlib
 import json
+import threading
+
+try:
+    from numba import njit
+except ImportError:  # Optional: JIT-compiled score post-processing
+    njit = None
+
+
+# INT8 dynamically quantized ONNX export (AVX-512 VNNI kernels), published
+# alongside all-MiniLM-L6-v2 on the Hugging Face Hub
+ONNX_INT8_FILE_NAME = "onnx/model_qint8_avx512_vnni.onnx"
+
+# HNSW index settings for the ticket collection (higher recall than defaults;
+# search cost is dominated by the embedding model, not the index)
+HNSW_METADATA = {
+    # Inner product on L2-normalized embeddings is cosine similarity, without
+    # Chroma re-normalizing vectors on every query
+    "hnsw:space": "ip",
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100,
+    "hnsw:batch_size": 1000,
+    "hnsw:sync_threshold": 2000,
+}
+
+# Number of query embeddings kept in the LRU cache
+QUERY_CACHE_SIZE = 1000
+
+# Filterable metadata values (mirror Ticket.STATUS_CHOICES / PRIORITY_CHOICES)
+TICKET_STATUSES = ('open', 'in_progress', 'closed')
+TICKET_PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+
+def _build_where(status: Optional[str], priority: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Build a ChromaDB where filter; more than one condition needs $and"""
+    conditions = []
+    if status:
+        conditions.append({'status': status})
+    if priority:
+        conditions.append({'priority': priority})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+
+# Where filters for every (status, priority) combination, built once instead
+# of per search
+_FILTERS = {
+    (status, priority): _build_where(status, priority)
+    for status in (None,) + TICKET_STATUSES
+    for priority in (None,) + TICKET_PRIORITIES
+}
+
+
+# Thread pools are process-global, so they are configured at most once
+_torch_threads_configured = False
+_torch_threads_lock = threading.Lock()
+
+
+def _configure_torch_threads(num_threads: Optional[int] = None):
+    """
+    Size PyTorch's CPU thread pools for embedding inference
+
+    Only an explicit num_threads is applied, once per process. Otherwise
+    PyTorch's default (physical cores, or OMP_NUM_THREADS / a prior
+    torch.set_num_threads() by the operator) is left untouched.
+    """
+    global _torch_threads_configured
+    if not num_threads:
+        return
+    with _torch_threads_lock:
+        if _torch_threads_configured:
+            return
+        _torch_threads_configured = True
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            # Only settable before any inter-op work has run in this process
+            pass
+
+
+def _half_precision_dtype() -> Optional["torch.dtype"]:
+    """Pick a reduced-precision dtype for the embedding model on this host"""
+    if torch.cuda.is_available():
+        return torch.float16
+    # Private helper (torch>=2.3); older builds just keep FP32 on CPU
+    bf16_supported = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+    if bf16_supported is not None and bf16_supported():
+        return torch.bfloat16
+    return None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _distances_to_scores(dists: np.ndarray) -> np.ndarray:
+        """Convert inner-product distances to 0-1 relevance scores"""
+        scores = np.empty_like(dists)
+        for i in range(dists.shape[0]):
+            scores[i] = max(0.0, min(1.0, 1.0 - dists[i]))
+        return scores
+else:
+    def _distances_to_scores(dists: np.ndarray) -> np.ndarray:
+        """Convert inner-product distances to 0-1 relevance scores"""
+        return np.clip(1.0 - dists, 0.0, 1.0)
+
+
+def _format_date(value):
+    """Render date-like values as YYYY-MM-DD, leaving anything else as is"""
+    strftime = getattr(value, 'strftime', None)
+    return strftime('%Y-%m-%d') if strftime is not None else value
+
+
+@dataclass(slots=True, frozen=True)
+class TicketPayload:
+    """
+    Ticket fields used for indexing
+
+    Slot attribute access replaces repeated dict lookups when formatting
+    and building metadata. Plain ticket dicts are still accepted everywhere
+    and converted with from_data().
+    """
+    id: Any
+    title: str = ''
+    ticket_description: str = ''
+    status: str = ''
+    priority: str = ''
+    created_by: str = ''
+    assigned_to: str = 'Unassigned'
+    created_date: Optional[datetime] = None
+    closed_date: Optional[datetime] = None
+    cc_admins: Tuple[str, ...] = ()
+    cc_non_admins: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_data(cls, ticket_data: "TicketData") -> "TicketPayload":
+        """Build a payload from a ticket dict (payloads are returned as is)"""
+        if isinstance(ticket_data, cls):
+            return ticket_data
+        return cls(
+            id=ticket_data['id'],
+            title=ticket_data.get('title', ''),
+            ticket_description=ticket_data.get('ticket_description', ''),
+            status=ticket_data.get('status', ''),
+            priority=ticket_data.get('priority', ''),
+            created_by=ticket_data.get('created_by', ''),
+            assigned_to=ticket_data.get('assigned_to', 'Unassigned'),
+            created_date=ticket_data.get('created_date'),
+            closed_date=ticket_data.get('closed_date'),
+            cc_admins=tuple(ticket_data.get('cc_admins') or ()),
+            cc_non_admins=tuple(ticket_data.get('cc_non_admins') or ()),
+        )
+
+
+TicketData = Union[Dict[str, Any], TicketPayload]
 
 
 class TicketRAGService:
@@ -17,110 +177,280 @@ class TicketRAGService:
     - Ollama for LLM generation (runs locally)
     """
     
-    def __init__(self, collection_name: str = "tickets", model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        collection_name: str = "tickets",
+        model_name: str = "all-MiniLM-L6-v2",
+        backend: str = "torch",
+        onnx_file_name: str = ONNX_INT8_FILE_NAME,
+        num_threads: Optional[int] = None,
+        half_precision: bool = True,
+        chroma_host: Optional[str] = None,
+        chroma_port: int = 8000,
+        auto_migrate: bool = False
+    ):
         """
         Initialize the RAG service
         
         Args:
             collection_name: Name of the ChromaDB collection
             model_name: Sentence transformer model to use
+            backend: Inference backend, "torch" or "onnx" (ONNX Runtime,
+                requires sentence-transformers>=3.2 and optimum[onnxruntime])
+            onnx_file_name: ONNX model file to load when backend="onnx"
+                (defaults to the INT8 dynamically quantized export)
+            num_threads: PyTorch intra-op CPU threads, applied once per
+                process (defaults to PyTorch's own setting)
+            half_precision: Run the torch model in FP16 on CUDA or BF16 on
+                CPUs with AVX-512 BF16 (embeddings are still stored as FP32)
+            chroma_host: ChromaDB server host (`chroma run`); when unset the
+                index is embedded in this process under ./chroma_db
+            chroma_port: ChromaDB server port
+            auto_migrate: Rebuild a collection created with outdated HNSW
+                settings. Leave off in multi-worker deployments and run
+                `python manage.py rebuild_rag_index` once instead.
         """
+        _configure_torch_threads(num_threads)
+
         # Initialize embedding model (runs locally on CPU/GPU)
-        print(f"Loading embedding model: {model_name}")
-        self.embedding_model = SentenceTransformer(model_name)
+        print(f"Loading embedding model: {model_name} ({backend})")
+        if backend == "torch":
+            self.embedding_model = SentenceTransformer(model_name)
+            dtype = _half_precision_dtype() if half_precision else None
+            if dtype is not None:
+                print(f"Using {dtype} weights for the embedding model")
+                self.embedding_model.to(dtype)
+        else:
+            self.embedding_model = SentenceTransformer(
+                model_name,
+                backend=backend,
+                model_kwargs={"file_name": onnx_file_name}
+            )
+        self.embedding_model.eval()
         
-        # Initialize ChromaDB (persistent storage)
-        self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
+        # LRU cache of query embeddings (repeated searches skip the model)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # Uncased tokenizers (e.g. MiniLM's) produce the same input ids
+        # regardless of case, so such queries can share a cache entry
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        self._lowercase_queries = bool(getattr(tokenizer, "do_lower_case", False))
+
+        # Initialize ChromaDB: a shared server when configured, so the index is
+        # loaded once instead of in every worker, else embedded persistent storage
+        if chroma_host:
+            self.chroma_client = chromadb.HttpClient(host=chroma_host, port=chroma_port)
+        else:
+            self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
         
         # Get or create collection
         try:
             self.collection = self.chroma_client.get_collection(name=collection_name)
             print(f"Loaded existing collection: {collection_name}")
         except:
-            self.collection = self.chroma_client.create_collection(
-                name=collection_name,
-                metadata={
-                    "description": "Ticket system embeddings",
-                    "hnsw:space": "cosine"  # Use cosine similarity (better for text)
-                }
+            self.collection = self._recover_rebuilt_collection(collection_name)
+            if self.collection is None:
+                self.collection = self._create_collection(collection_name)
+                print(f"Created new collection: {collection_name}")
+
+        # HNSW settings are fixed at creation, so older collections are rebuilt
+        if self.needs_index_migration():
+            if auto_migrate:
+                self.migrate_index()
+            else:
+                print(
+                    f"Collection {collection_name} uses outdated index settings; "
+                    f"relevance scores may be off until it is rebuilt with "
+                    f"'python manage.py rebuild_rag_index'"
+                )
+
+    def _create_collection(self, name: str):
+        """Create a collection with the current HNSW index settings"""
+        return self.chroma_client.create_collection(
+            name=name,
+            metadata={
+                "description": "Ticket system embeddings",
+                **HNSW_METADATA
+            }
+        )
+
+    def _recover_rebuilt_collection(self, name: str):
+        """
+        Adopt the rebuilt copy left behind by an interrupted index migration
+
+        migrate_index() deletes the old collection before renaming the
+        rebuilt one; if it stopped in between, only `<name>_rebuild` exists.
+        """
+        try:
+            collection = self.chroma_client.get_collection(name=f"{name}_rebuild")
+        except Exception:
+            return None
+        collection.modify(name=name)
+        print(f"Recovered collection {name} from an interrupted index rebuild")
+        return collection
+
+    def needs_index_migration(self) -> bool:
+        """Check whether the collection was created with other HNSW settings"""
+        metadata = self.collection.metadata or {}
+        return any(metadata.get(key) != value for key, value in HNSW_METADATA.items())
+
+    def migrate_index(self, batch_size: int = 1000):
+        """
+        Rebuild the collection with the current HNSW settings
+
+        Stored embeddings, documents and metadata are copied into a new
+        collection, which then replaces the old one under the same name.
+        Run it from a single process (e.g. the rebuild_rag_index command);
+        concurrent rebuilds of the same collection race on the temp copy.
+        """
+        name = self.collection.name
+        print(f"Rebuilding collection {name} with updated index settings...")
+
+        data = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        ids = data['ids']
+
+        # Inner-product search needs unit-length vectors
+        if ids:
+            embeddings = np.asarray(data['embeddings'], dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+
+        temp_name = f"{name}_rebuild"
+        try:
+            self.chroma_client.delete_collection(name=temp_name)
+        except Exception:
+            pass
+        new_collection = self._create_collection(temp_name)
+
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            new_collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end].tolist(),
+                documents=data['documents'][start:end],
+                metadatas=data['metadatas'][start:end]
             )
-            print(f"Created new collection: {collection_name}")
 
-    def format_ticket_for_embedding(self, ticket_data: Dict[str, Any]) -> str:
+        # The rebuilt copy is complete; if the swap is interrupted after the
+        # delete, _recover_rebuilt_collection() adopts it on the next start
+        self.chroma_client.delete_collection(name=name)
+        new_collection.modify(name=name)
+        self.collection = new_collection
+        print(f"Rebuilt collection {name} ({len(ids)} tickets)")
+
+    @staticmethod
+    def format_ticket_for_embedding(ticket_data: TicketData) -> str:
         """
         Format ticket data into a searchable text representation
 
         Args:
-            ticket_data: Dictionary containing ticket fields
+            ticket_data: Ticket dict or TicketPayload
 
         Returns:
             Formatted string for embedding
         """
-        # Extract fields
-        ticket_id = ticket_data.get('id', 'N/A')
-        title = ticket_data.get('title', '')
-        description = ticket_data.get('ticket_description', '')
-        status = ticket_data.get('status', 'N/A')
-        priority = ticket_data.get('priority', 'N/A')
-        created_by = ticket_data.get('created_by', 'Unknown')
-        assigned_to = ticket_data.get('assigned_to', 'Unassigned')
-        created_date = ticket_data.get('created_date', '')
-        closed_date = ticket_data.get('closed_date', '')
-        cc_admins = ticket_data.get('cc_admins', [])
-        cc_non_admins = ticket_data.get('cc_non_admins', [])
-
-        # Format date strings
-        if isinstance(created_date, datetime):
-            created_date = created_date.strftime('%Y-%m-%d')
-        if isinstance(closed_date, datetime):
-            closed_date = closed_date.strftime('%Y-%m-%d')
+        ticket = TicketPayload.from_data(ticket_data)
 
-        # Create formatted text optimized for semantic search
-        formatted_text = f"""
-Ticket #{ticket_id}: {title}
-
-Description: {description}
+        # Format date strings (datetime and date both have strftime)
+        created_date = _format_date(ticket.created_date)
+        closed_date = _format_date(ticket.closed_date)
 
-Status: {status}
-Priority: {priority}
-Created by: {created_by}
-Assigned to: {assigned_to}
-Created on: {created_date}
-{f"Closed on: {closed_date}" if closed_date else "Status: Open"}
+        # Create formatted text optimized for semantic search
+        return "".join([
+            "Ticket #", str(ticket.id), ": ", str(ticket.title),
+            "\n\nDescription: ", str(ticket.ticket_description),
+            "\n\nStatus: ", str(ticket.status or 'N/A'),
+            "\nPriority: ", str(ticket.priority or 'N/A'),
+            "\nCreated by: ", str(ticket.created_by or 'Unknown'),
+            "\nAssigned to: ", str(ticket.assigned_to or 'Unassigned'),
+            "\nCreated on: ", '' if created_date is None else str(created_date),
+            "\n", f"Closed on: {closed_date}" if closed_date else "Status: Open",
+            "\n\nCC Admins: ", ', '.join(ticket.cc_admins) if ticket.cc_admins else 'None',
+            "\nCC Non-Admins: ", ', '.join(ticket.cc_non_admins) if ticket.cc_non_admins else 'None',
+        ]).strip()
+
+    def _build_metadata(self, ticket: TicketPayload, document: str) -> Dict[str, Any]:
+        """Build the ChromaDB metadata stored alongside a ticket embedding"""
+        return {
+            'ticket_id': str(ticket.id),
+            'title': ticket.title,
+            'status': ticket.status,
+            'priority': ticket.priority,
+            'created_by': ticket.created_by,
+            'assigned_to': ticket.assigned_to,
+            'created_date': '' if ticket.created_date is None else str(ticket.created_date),
+            'content_hash': self.content_hash(ticket),
+            'document_hash': self.document_hash(document),
+        }
+
+    def content_hash(self, ticket_data: TicketData) -> str:
+        """
+        Hash the fields that drive a ticket's semantic content
 
-CC Admins: {', '.join(cc_admins) if cc_admins else 'None'}
-CC Non-Admins: {', '.join(cc_non_admins) if cc_non_admins else 'None'}
-        """.strip()
+        Covers every embedded field that searches target (title, description,
+        creator, assignee and CC users). Status, priority and dates are left
+        out, so changing them keeps the stored embedding; they are still
+        filterable through metadata.
 
-        return formatted_text
+        Args:
+            ticket_data: Ticket dict or TicketPayload
 
-    def add_ticket(self, ticket_data: Dict[str, Any]) -> bool:
+        Returns:
+            Hex digest of the embedding-relevant fields
+        """
+        ticket = TicketPayload.from_data(ticket_data)
+        content = "\0".join([
+            str(ticket.title),
+            str(ticket.ticket_description),
+            str(ticket.created_by or ''),
+            str(ticket.assigned_to or ''),
+            ','.join(ticket.cc_admins or ()),
+            ','.join(ticket.cc_non_admins or ()),
+        ])
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def document_hash(document: str) -> str:
+        """Hash the full indexed document (every field stored for a ticket)"""
+        return hashlib.blake2b(document.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _stored_entry(self, ticket_id: str) -> Optional[Tuple[Dict[str, Any], List[float]]]:
+        """Return the stored metadata and embedding for a ticket, if indexed"""
+        existing = self.collection.get(ids=[ticket_id], include=["metadatas", "embeddings"])
+        if not existing['ids']:
+            return None
+        return existing['metadatas'][0], existing['embeddings'][0]
+
+    def add_ticket(self, ticket_data: TicketData) -> bool:
         """
         Add or update a ticket in the vector database
 
         Args:
-            ticket_data: Dictionary containing ticket fields
+            ticket_data: Ticket dict or TicketPayload
 
         Returns:
             True if successful
         """
         try:
-            ticket_id = str(ticket_data['id'])
-            formatted_text = self.format_ticket_for_embedding(ticket_data)
-
-            # Generate embedding
-            embedding = self.embedding_model.encode(formatted_text).tolist()
+            ticket = TicketPayload.from_data(ticket_data)
+            ticket_id = str(ticket.id)
+            formatted_text = self.format_ticket_for_embedding(ticket)
 
             # Store metadata separately for filtering
-            metadata = {
-                'ticket_id': ticket_id,
-                'title': ticket_data.get('title', ''),
-                'status': ticket_data.get('status', ''),
-                'priority': ticket_data.get('priority', ''),
-                'created_by': ticket_data.get('created_by', ''),
-                'assigned_to': ticket_data.get('assigned_to', ''),
-                'created_date': str(ticket_data.get('created_date', '')),
-            }
+            metadata = self._build_metadata(ticket, formatted_text)
+
+            embedding = None
+            stored = self._stored_entry(ticket_id)
+            if stored is not None:
+                stored_metadata, stored_embedding = stored
+                # Nothing changed since the last sync (e.g. an unrelated re-save)
+                if stored_metadata.get('document_hash') == metadata['document_hash']:
+                    return True
+                # Only re-embed when searchable content changed (e.g. not on status flips)
+                if stored_metadata.get('content_hash') == metadata['content_hash']:
+                    embedding = np.asarray(stored_embedding, dtype=np.float32).tolist()
+            if embedding is None:
+                embedding = self._encode(formatted_text).tolist()
 
             # Add to ChromaDB (upsert - updates if exists)
             self.collection.upsert(
@@ -137,24 +467,102 @@ CC Non-Admins: {', '.join(cc_non_admins) if cc_non_admins else 'None'}
             print(f"Error adding ticket: {e}")
             return False
 
-    def add_tickets_bulk(self, tickets_data: List[Dict[str, Any]]) -> int:
+    def add_tickets_bulk(self, tickets_data: List[TicketData], batch_size: int = 100) -> int:
         """
         Add multiple tickets in bulk
 
+        All embeddings are computed up front, then written to ChromaDB with
+        one upsert per batch instead of one per ticket.
+
         Args:
-            tickets_data: List of ticket dictionaries
+            tickets_data: List of ticket dicts or TicketPayloads
+            batch_size: Number of tickets written per ChromaDB upsert
 
         Returns:
             Number of tickets successfully added
         """
         success_count = 0
-        for ticket_data in tickets_data:
-            if self.add_ticket(ticket_data):
-                success_count += 1
+        try:
+            tickets = [TicketPayload.from_data(t) for t in tickets_data]
+            # ChromaDB rejects duplicate ids in one upsert; the last entry wins,
+            # as it did with one upsert per ticket
+            tickets = list({str(t.id): t for t in tickets}.values())
+            ids = [str(t.id) for t in tickets]
+            documents = [self.format_ticket_for_embedding(t) for t in tickets]
+            metadatas = [self._build_metadata(t, doc) for t, doc in zip(tickets, documents)]
+
+            # Generate all embeddings in one batched pass
+            embeddings = self._encode(documents, batch_size=64, show_progress_bar=False)
+        except Exception as e:
+            print(f"Error preparing tickets: {e}")
+            return 0
+
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            try:
+                self.collection.upsert(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end].tolist(),
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end]
+                )
+                success_count += len(ids[start:end])
+            except Exception as e:
+                print(f"Error adding tickets {start + 1}-{min(end, len(ids))}: {e}")
 
         print(f"Successfully added {success_count}/{len(tickets_data)} tickets")
         return success_count
 
+    def _encode(self, texts, **kwargs) -> np.ndarray:
+        """Embed one text or a list of texts as L2-normalized FP32 vectors"""
+        with torch.inference_mode():
+            embeddings = self.embedding_model.encode(
+                texts,
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+                **kwargs
+            )
+            # Upcast before leaving torch: older sentence-transformers call
+            # .numpy() on raw outputs, which fails for bfloat16 tensors, and
+            # FP16/BF16 must not leak reduced precision into the index
+            return embeddings.float().cpu().numpy()
+
+    def _query_cache_key(self, query: str) -> str:
+        """Normalize a query the way the tokenizer would (whitespace, case)"""
+        key = " ".join(query.split())
+        return key.lower() if self._lowercase_queries else key
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a search query, reusing cached embeddings for repeated queries
+
+        Queries that tokenize identically (differing only in whitespace, or
+        case for uncased models) skip both the tokenizer and the model.
+
+        Args:
+            query: Natural language search query
+
+        Returns:
+            Query embedding (read-only float32 array)
+        """
+        query = self._query_cache_key(query)
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+            if embedding is not None:
+                self._query_cache.move_to_end(query)
+                return embedding
+
+        embedding = np.asarray(self._encode(query), dtype=np.float32)
+        embedding.setflags(write=False)
+
+        with self._query_cache_lock:
+            self._query_cache[query] = embedding
+            self._query_cache.move_to_end(query)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+        return embedding
+
     def search_tickets(
         self,
         query: str,
@@ -175,43 +583,43 @@ CC Non-Admins: {', '.join(cc_non_admins) if cc_non_admins else 'None'}
             List of matching tickets with relevance scores
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
+            # Generate query embedding (cached for repeated queries)
+            query_embedding = self.embed_query(query).tolist()
 
-            # Build filter
-            where_filter = {}
-            if filter_status:
-                where_filter['status'] = filter_status
-            if filter_priority:
-                where_filter['priority'] = filter_priority
+            # Precomputed filter; values outside the known choices are built on demand
+            key = (filter_status or None, filter_priority or None)
+            where_filter = _FILTERS[key] if key in _FILTERS else _build_where(*key)
 
             # Search in ChromaDB
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results,
-                where=where_filter if where_filter else None
+                where=where_filter
             )
 
             # Format results
-            formatted_results = []
-            if results['ids'] and results['ids'][0]:
-                for i, ticket_id in enumerate(results['ids'][0]):
-                    # Calculate relevance score from distance
-                    # With cosine similarity: distance ranges from 0 (identical) to 2 (opposite)
-                    # Convert to percentage: 0 = 100% relevant, 2 = 0% relevant
-                    distance = results['distances'][0][i] if 'distances' in results else 0
-
-                    # Cosine distance to similarity: similarity = 1 - (distance / 2)
-                    # Map to 0-1 scale
-                    relevance_score = max(0, min(1, 1 - (distance / 2)))
-
-                    formatted_results.append({
-                        'ticket_id': ticket_id,
-                        'content': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i],
-                        'distance': distance,
-                        'relevance_score': relevance_score
-                    })
+            if not results['ids'] or not results['ids'][0]:
+                return []
+
+            ids = results['ids'][0]
+            docs = results['documents'][0]
+            metas = results['metadatas'][0]
+            dists = np.asarray(results['distances'][0], dtype=np.float32)
+
+            # Inner-product distance on normalized vectors is 1 - cosine similarity;
+            # relevance is the similarity, clipped to a 0-1 scale
+            scores = _distances_to_scores(dists)
+
+            formatted_results = [
+                {
+                    'ticket_id': ticket_id,
+                    'content': doc,
+                    'metadata': meta,
+                    'distance': float(dist),
+                    'relevance_score': float(score)
+                }
+                for ticket_id, doc, meta, dist, score in zip(ids, docs, metas, dists, scores)
+            ]
 
             return formatted_results
 
@@ -219,6 +627,34 @@ CC Non-Admins: {', '.join(cc_non_admins) if cc_non_admins else 'None'}
             print(f"Error searching tickets: {e}")
             return []
 
+    def list_all(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        List stored tickets without running a similarity search
+
+        Args:
+            limit: Maximum number of tickets to return
+
+        Returns:
+            List of tickets with their content and metadata
+        """
+        try:
+            results = self.collection.get(limit=limit, include=["metadatas", "documents"])
+
+            return [
+                {
+                    'ticket_id': ticket_id,
+                    'content': document,
+                    'metadata': metadata
+                }
+                for ticket_id, document, metadata in zip(
+                    results['ids'], results['documents'], results['metadatas']
+                )
+            ]
+
+        except Exception as e:
+            print(f"Error listing tickets: {e}")
+            return []
+
     def delete_ticket(self, ticket_id: str) -> bool:
         """
         Delete a ticket from the vector database
@@ -0,0 +1,134 @@
+"""
+Sample ticket data shared by the demo scripts
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+
+# Ticket ages are relative so the data stays fresh; dates are filled in by
+# get_sample_tickets()
+SAMPLE_TICKETS_TEMPLATE = [
+    {
+        'id': 1,
+        'title': 'Login page not loading',
+        'ticket_description': 'Users are reporting that the login page shows a blank screen when accessed from Chrome browser. This started happening after the latest deployment.',
+        'status': 'open',
+        'priority': 'high',
+        'created_ago': timedelta(days=2),
+        'closed_ago': None,
+        'created_by': 'john.doe',
+        'assigned_to': 'jane.smith',
+        'cc_admins': ['admin1', 'admin2'],
+        'cc_non_admins': ['user1']
+    },
+    {
+        'id': 2,
+        'title': 'Password reset emails not sending',
+        'ticket_description': 'Multiple users have reported not receiving password reset emails. SMTP server logs show connection timeout errors.',
+        'status': 'in_progress',
+        'priority': 'urgent',
+        'created_ago': timedelta(days=1),
+        'closed_ago': None,
+        'created_by': 'sarah.johnson',
+        'assigned_to': 'bob.wilson',
+        'cc_admins': ['admin1'],
+        'cc_non_admins': []
+    },
+    {
+        'id': 3,
+        'title': 'Dashboard loading slowly',
+        'ticket_description': 'The main dashboard takes 30+ seconds to load. Database queries appear to be unoptimized. Affecting all users.',
+        'status': 'open',
+        'priority': 'medium',
+        'created_ago': timedelta(days=5),
+        'closed_ago': None,
+        'created_by': 'mike.brown',
+        'assigned_to': 'alice.chen',
+        'cc_admins': [],
+        'cc_non_admins': ['user2', 'user3']
+    },
+    {
+        'id': 4,
+        'title': 'Export to CSV feature broken',
+        'ticket_description': 'When users try to export reports to CSV, they receive a 500 error. Error logs show encoding issues with special characters.',
+        'status': 'closed',
+        'priority': 'low',
+        'created_ago': timedelta(days=10),
+        'closed_ago': timedelta(days=3),
+        'created_by': 'lisa.anderson',
+        'assigned_to': 'jane.smith',
+        'cc_admins': ['admin2'],
+        'cc_non_admins': []
+    },
+    {
+        'id': 5,
+        'title': 'Mobile app crashes on iOS 17',
+        'ticket_description': 'Users on iOS 17 report that the mobile app crashes immediately after opening. Works fine on iOS 16 and Android.',
+        'status': 'open',
+        'priority': 'high',
+        'created_ago': timedelta(hours=6),
+        'closed_ago': None,
+        'created_by': 'tom.davis',
+        'assigned_to': 'bob.wilson',
+        'cc_admins': ['admin1', 'admin2'],
+        'cc_non_admins': ['user1', 'user2']
+    },
+    {
+        'id': 6,
+        'title': 'API rate limiting too aggressive',
+        'ticket_description': 'Partners are complaining that API rate limits are too strict. They are getting 429 errors even with normal usage patterns.',
+        'status': 'in_progress',
+        'priority': 'medium',
+        'created_ago': timedelta(days=4),
+        'closed_ago': None,
+        'created_by': 'emily.white',
+        'assigned_to': 'alice.chen',
+        'cc_admins': [],
+        'cc_non_admins': ['user3']
+    },
+    {
+        'id': 7,
+        'title': 'Unable to upload large files',
+        'ticket_description': 'Users cannot upload files larger than 50MB. System shows "Request Entity Too Large" error. Need to increase upload limit.',
+        'status': 'closed',
+        'priority': 'medium',
+        'created_ago': timedelta(days=15),
+        'closed_ago': timedelta(days=8),
+        'created_by': 'chris.lee',
+        'assigned_to': 'jane.smith',
+        'cc_admins': ['admin2'],
+        'cc_non_admins': []
+    },
+    {
+        'id': 8,
+        'title': 'Search functionality returns no results',
+        'ticket_description': 'Global search feature is broken. Users enter queries but get zero results even for known existing content.',
+        'status': 'open',
+        'priority': 'urgent',
+        'created_ago': timedelta(hours=12),
+        'closed_ago': None,
+        'created_by': 'david.martinez',
+        'assigned_to': 'Unassigned',
+        'cc_admins': ['admin1'],
+        'cc_non_admins': ['user1', 'user2']
+    },
+]
+
+
+def get_sample_tickets() -> List[Dict[str, Any]]:
+    """
+    Create sample ticket data for testing
+
+    Returns:
+        List of ticket dictionaries with concrete created/closed dates
+    """
+    now = datetime.now()
+    tickets = []
+    for template in SAMPLE_TICKETS_TEMPLATE:
+        ticket = {k: v for k, v in template.items() if k not in ('created_ago', 'closed_ago')}
+        ticket['created_date'] = now - template['created_ago']
+        ticket['closed_date'] = now - template['closed_ago'] if template['closed_ago'] else None
+        ticket['cc_admins'] = list(template['cc_admins'])
+        ticket['cc_non_admins'] = list(template['cc_non_admins'])
+        tickets.append(ticket)
+    return tickets
@@ -2,49 +2,146 @@
 Django signals to automatically update RAG when tickets are created/updated/deleted
 Add this to your tickets/signals.py
 """
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Prefetch
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from tickets.models import Ticket
-from tickets.rag_service import TicketRAGService
+from tickets.rag_service import TicketRAGService, TicketPayload
+from concurrent.futures import ThreadPoolExecutor, wait
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 # Initialize RAG service (singleton pattern)
 _rag_service = None
+_rag_service_lock = threading.Lock()
 
 def get_rag_service():
+    """
+    Return the process-wide RAG service, creating it on first use
+
+    Shared by signals and views so the embedding model and ChromaDB client
+    are loaded once per process. Thread-safe for threaded WSGI workers.
+    Set CHROMA_HOST (and CHROMA_PORT) in settings to use a ChromaDB server
+    shared by all workers instead of an embedded index per process.
+    """
     global _rag_service
     if _rag_service is None:
-        _rag_service = TicketRAGService()
+        with _rag_service_lock:
+            if _rag_service is None:
+                _rag_service = TicketRAGService(
+                    chroma_host=getattr(settings, 'CHROMA_HOST', None),
+                    chroma_port=getattr(settings, 'CHROMA_PORT', 8000)
+                )
     return _rag_service
 
 
+# RAG writes run off the request thread; at most one pending task per ticket
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-sync")
+_pending = {}
+_pending_lock = threading.RLock()  # Re-entrant: cancel() runs done callbacks inline
+
+
+def _run_after(previous, func, *args):
+    """Run func once the previous task for the same ticket has finished"""
+    if previous is not None:
+        wait([previous])
+    func(*args)
+
+
+def _submit_for_ticket(ticket_id, func, *args):
+    """
+    Queue a RAG update for a ticket, replacing any queued-but-unstarted one
+
+    Bursts of saves/CC changes on the same ticket collapse into a single
+    update with the latest data, and updates for one ticket never overlap.
+    """
+    with _pending_lock:
+        previous = _pending.get(ticket_id)
+        if previous is not None:
+            waits_for = previous.waits_for
+            if previous.cancel():
+                # Superseded before it started; wait on what it was waiting on
+                previous = waits_for
+
+        future = _executor.submit(_run_after, previous, func, *args)
+        future.waits_for = previous
+        _pending[ticket_id] = future
+
+    def _forget(done):
+        with _pending_lock:
+            done.waits_for = None
+            if _pending.get(ticket_id) is done:
+                del _pending[ticket_id]
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Error updating ticket #{ticket_id} in RAG: {done.exception()}")
+
+    future.add_done_callback(_forget)
+    return future
+
+
+def _add_to_rag(ticket_data):
+    get_rag_service().add_ticket(ticket_data)
+
+
+def _delete_from_rag(ticket_id):
+    get_rag_service().delete_ticket(ticket_id)
+
+
+def rag_ticket_queryset():
+    """Tickets with every field needed for indexing loaded up front"""
+    return (
+        Ticket.objects
+        .select_related('created_by', 'assigned_to')
+        .prefetch_related(
+            Prefetch('cc_admins', queryset=User.objects.only('username')),
+            Prefetch('cc_non_admins', queryset=User.objects.only('username')),
+        )
+        .only(
+            'id', 'title', 'ticket_description', 'status', 'priority',
+            'created_date', 'closed_date',
+            'created_by__username', 'assigned_to__username',
+        )
+    )
+
+
+def ticket_to_payload(ticket):
+    """Convert a ticket from rag_ticket_queryset() into a TicketPayload"""
+    return TicketPayload(
+        id=ticket.id,
+        title=ticket.title,
+        ticket_description=ticket.ticket_description,
+        status=ticket.status,
+        priority=ticket.priority,
+        created_date=ticket.created_date,
+        closed_date=ticket.closed_date,
+        created_by=ticket.created_by.username,
+        assigned_to=ticket.assigned_to.username if ticket.assigned_to else 'Unassigned',
+        cc_admins=tuple(u.username for u in ticket.cc_admins.all()),
+        cc_non_admins=tuple(u.username for u in ticket.cc_non_admins.all()),
+    )
+
+
 @receiver(post_save, sender=Ticket)
 def sync_ticket_to_rag(sender, instance, created, **kwargs):
     """
     Automatically sync ticket to RAG when created or updated
     """
     try:
-        rag_service = get_rag_service()
+        # One joined query plus one per CC list, instead of a query per relation
+        # (read from the database the change was written to)
+        using = kwargs.get('using', DEFAULT_DB_ALIAS)
+        ticket = rag_ticket_queryset().using(using).get(pk=instance.pk)
+        ticket_data = ticket_to_payload(ticket)
         
-        ticket_data = {
-            'id': instance.id,
-            'title': instance.title,
-            'ticket_description': instance.ticket_description,
-            'status': instance.status,
-            'priority': instance.priority,
-            'created_date': instance.created_date,
-            'closed_date': instance.closed_date,
-            'created_by': instance.created_by.username,
-            'assigned_to': instance.assigned_to.username if instance.assigned_to else 'Unassigned',
-            'cc_admins': [u.username for u in instance.cc_admins.all()],
-            'cc_non_admins': [u.username for u in instance.cc_non_admins.all()],
-        }
-        
-        rag_service.add_ticket(ticket_data)
+        # Data is collected here while the instance is live; embedding is async
+        _submit_for_ticket(instance.id, _add_to_rag, ticket_data)
         action = "Created" if created else "Updated"
-        logger.info(f"{action} ticket #{instance.id} in RAG")
+        logger.info(f"{action} ticket #{instance.id} queued for RAG")
         
     except Exception as e:
         logger.error(f"Error syncing ticket #{instance.id} to RAG: {e}")
@@ -56,23 +153,57 @@ def delete_ticket_from_rag(sender, instance, **kwargs):
     Automatically remove ticket from RAG when deleted
     """
     try:
-        rag_service = get_rag_service()
-        rag_service.delete_ticket(str(instance.id))
-        logger.info(f"Deleted ticket #{instance.id} from RAG")
+        _submit_for_ticket(instance.id, _delete_from_rag, str(instance.id))
+        logger.info(f"Ticket #{instance.id} queued for deletion from RAG")
         
     except Exception as e:
         logger.error(f"Error deleting ticket #{instance.id} from RAG: {e}")
 
 
+# Per-thread {(db alias, ticket_id): on_commit callback} for deferred CC re-syncs
+_cc_sync_state = threading.local()
+
+
+def _is_pending_on_commit(callback, using):
+    """
+    Check whether a callback is still registered to run on commit
+
+    Relies on Django internals: run_on_commit is a private list of
+    (savepoint ids, callback, robust) entries, so entry[1] is the callback.
+    """
+    connection = transaction.get_connection(using)
+    return any(entry[1] is callback for entry in connection.run_on_commit)
+
+
 @receiver(m2m_changed, sender=Ticket.cc_admins.through)
 @receiver(m2m_changed, sender=Ticket.cc_non_admins.through)
 def sync_ticket_cc_changes(sender, instance, action, **kwargs):
     """
     Sync ticket when CC lists are updated
+
+    The re-sync is deferred until the transaction commits, and only scheduled
+    once per ticket per transaction however many CC changes are made.
     """
     if action in ['post_add', 'post_remove', 'post_clear']:
         try:
-            # Re-sync the entire ticket
-            sync_ticket_to_rag(Ticket, instance, created=False)
+            # The change may be on any database alias; defer on that connection
+            using = kwargs.get('using', DEFAULT_DB_ALIAS)
+            key = (using, instance.pk)
+            scheduled = getattr(_cc_sync_state, 'callbacks', None)
+            if scheduled is None:
+                scheduled = _cc_sync_state.callbacks = {}
+
+            # A callback left over from a rolled-back transaction doesn't count
+            existing = scheduled.get(key)
+            if existing is not None and _is_pending_on_commit(existing, using):
+                return
+
+            def resync():
+                scheduled.pop(key, None)
+                # Re-sync the entire ticket
+                sync_ticket_to_rag(Ticket, instance, created=False, using=using)
+
+            scheduled[key] = resync
+            transaction.on_commit(resync, using=using)
         except Exception as e:
             logger.error(f"Error syncing CC changes for ticket #{instance.id}: {e}")
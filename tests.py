@@ -0,0 +1,135 @@
+"""
+Tests for the RAG ticket views, signals and service
+Add this to your tickets/tests.py
+"""
+from unittest import mock
+
+import numpy as np
+import torch
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import transaction
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+
+from tickets.models import Ticket
+from tickets.rag_service import TicketRAGService
+from tickets.views import TicketSearchRAGView
+
+
+@override_settings(LOGIN_URL='/login/')
+class TicketSearchRAGViewAsyncTests(TestCase):
+    """The async search view must authenticate without blocking the event loop"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='jane.smith', password='secret')
+        self.factory = AsyncRequestFactory()
+        self.rag_service = mock.Mock()
+        self.rag_service.search_tickets.return_value = [
+            {'ticket_id': '1', 'content': 'Ticket #1', 'metadata': {}, 'distance': 0.2, 'relevance_score': 0.8}
+        ]
+        patcher = mock.patch('tickets.views.get_rag_service', return_value=self.rag_service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _request(self, logged_in=True):
+        """Build a POST that goes through the session and auth middleware"""
+        request = self.factory.post(
+            '/tickets/rag-search/',
+            data={'query': 'login problems'},
+            content_type='application/json'
+        )
+        if logged_in:
+            self.client.force_login(self.user)
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        SessionMiddleware(lambda r: None).process_request(request)
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        return request
+
+    async def test_authenticated_search(self):
+        request = await sync_to_async(self._request)()
+        response = await TicketSearchRAGView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.rag_service.search_tickets.assert_called_once()
+
+    async def test_anonymous_search_redirects_to_login(self):
+        request = await sync_to_async(self._request)(logged_in=False)
+        response = await TicketSearchRAGView.as_view()(request)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith('/login/'))
+        self.rag_service.search_tickets.assert_not_called()
+
+
+class TicketRAGServiceEncodeTests(SimpleTestCase):
+    """Reduced-precision models must still produce FP32 numpy embeddings"""
+
+    def setUp(self):
+        # Skip __init__: no model download or ChromaDB needed to test _encode
+        self.rag_service = TicketRAGService.__new__(TicketRAGService)
+        self.rag_service.embedding_model = mock.Mock()
+
+    def test_bfloat16_output_is_upcast(self):
+        self.rag_service.embedding_model.encode.return_value = torch.ones(2, 4, dtype=torch.bfloat16)
+
+        embeddings = self.rag_service._encode(['first ticket', 'second ticket'])
+
+        self.assertIsInstance(embeddings, np.ndarray)
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertEqual(embeddings.shape, (2, 4))
+        # Tensors are requested so the upcast happens before any .numpy() call
+        self.assertTrue(self.rag_service.embedding_model.encode.call_args.kwargs['convert_to_tensor'])
+
+    def test_single_query_stays_one_dimensional(self):
+        self.rag_service.embedding_model.encode.return_value = torch.ones(4, dtype=torch.float16)
+
+        embedding = self.rag_service._encode('login problem')
+
+        self.assertEqual(embedding.dtype, np.float32)
+        self.assertEqual(embedding.shape, (4,))
+
+
+class TicketCCSyncSignalTests(TestCase):
+    """CC changes are re-synced once per ticket per transaction, after commit"""
+
+    def setUp(self):
+        # Keep ticket creation from reaching the background RAG executor
+        patcher = mock.patch('tickets.signals._submit_for_ticket')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.creator = User.objects.create_user(username='john.doe')
+        self.admins = [User.objects.create_user(username=f'admin{i}') for i in range(3)]
+        self.ticket = Ticket.objects.create(
+            title='Email not syncing',
+            ticket_description='Outlook stopped syncing',
+            created_by=self.creator
+        )
+
+    def test_multiple_cc_changes_sync_once(self):
+        with mock.patch('tickets.signals.sync_ticket_to_rag') as sync:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with transaction.atomic():
+                    self.ticket.cc_admins.add(self.admins[0])
+                    self.ticket.cc_admins.add(self.admins[1])
+                    self.ticket.cc_non_admins.add(self.admins[2])
+
+        self.assertEqual(len(callbacks), 1)
+        sync.assert_called_once_with(Ticket, self.ticket, created=False, using='default')
+
+    def test_rollback_does_not_suppress_next_sync(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    self.ticket.cc_admins.add(self.admins[0])
+                    raise RuntimeError("roll back")
+            except RuntimeError:
+                pass
+
+            self.ticket.cc_admins.add(self.admins[1])
+
+        # The rolled-back callback is gone; the later change still scheduled one
+        self.assertEqual(len(callbacks), 1)
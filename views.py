@@ -1,27 +1,35 @@
 """
 Django views for RAG-powered ticket search
 """
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views import View
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-from tickets.rag_service import TicketRAGService
+from tickets.signals import get_rag_service
 from tickets.llm_service import LocalLLMService, MockLLMService
+import asyncio
 import json
 
 
-@method_decorator(login_required, name='dispatch')
+# Decorate the async handlers, not the sync View.dispatch: only then does
+# login_required use its async wrapper and load request.user off the event loop
+@method_decorator(login_required, name='get')
+@method_decorator(login_required, name='post')
 class TicketSearchRAGView(View):
     """
     View for RAG-powered natural language ticket search
+
+    Async so blocking embedding/search work runs in worker threads while the
+    event loop keeps serving other requests (serve under ASGI, e.g. uvicorn)
     """
     
-    def get(self, request):
+    async def get(self, request):
         """Render the search interface"""
-        return render(request, 'tickets/rag_search.html')
+        return await sync_to_async(render)(request, 'tickets/rag_search.html')
     
-    def post(self, request):
+    async def post(self, request):
         """Handle search queries"""
         try:
             # Parse request
@@ -35,11 +43,12 @@ class TicketSearchRAGView(View):
             if not query:
                 return JsonResponse({'error': 'Query is required'}, status=400)
             
-            # Initialize services
-            rag_service = TicketRAGService()
+            # Shared service (model and ChromaDB client are loaded once)
+            rag_service = await asyncio.to_thread(get_rag_service)
             
-            # Search for relevant tickets
-            results = rag_service.search_tickets(
+            # Search for relevant tickets (encode + ChromaDB query off the event loop)
+            results = await asyncio.to_thread(
+                rag_service.search_tickets,
                 query=query,
                 n_results=n_results,
                 filter_status=filter_status,
@@ -59,7 +68,7 @@ class TicketSearchRAGView(View):
                     llm_service = MockLLMService()  # Use mock by default
                     # llm_service = LocalLLMService()  # Uncomment if Ollama is running
                     
-                    answer = llm_service.generate_answer(query, results)
+                    answer = await asyncio.to_thread(llm_service.generate_answer, query, results)
                     response_data['generated_answer'] = answer
                 except Exception as e:
                     response_data['llm_error'] = str(e)
@@ -78,7 +87,7 @@ class TicketRAGStatsView(View):
     
     def get(self, request):
         try:
-            rag_service = TicketRAGService()
+            rag_service = get_rag_service()
             stats = rag_service.get_collection_stats()
             return JsonResponse(stats)
         except Exception as e: